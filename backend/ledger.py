@@ -0,0 +1,144 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+from backend import models
+
+# Take a balance snapshot every N ledger rows per fund, so balance lookups only
+# have to sum a short tail of transactions.
+SNAPSHOT_INTERVAL = 50
+
+# Float amounts; differences below this are treated as rounding noise.
+RECONCILE_TOLERANCE = 0.005
+
+def record_transaction(db: Session, fund_id: int, kind: str, amount: float, user_id: Optional[int] = None, expense_id: Optional[int] = None):
+    """Append a ledger row for a change to a fund's remaining balance.
+
+    Runs inside the caller's transaction; the caller commits. The caller must hold the
+    fund row lock (`with_for_update()`) so concurrent writers to the same fund are
+    serialised. The snapshot reads below are locking reads too: under REPEATABLE READ a
+    plain read would use the transaction's earlier read view and could miss rows
+    committed while waiting for the lock.
+    """
+    txn = models.FundTransaction(fund_id=fund_id, kind=kind, amount=amount, user_id=user_id, expense_id=expense_id)
+    db.add(txn)
+    db.flush()
+
+    last = db.query(models.FundBalanceSnapshot) \
+        .filter(models.FundBalanceSnapshot.fund_id == fund_id) \
+        .order_by(models.FundBalanceSnapshot.transaction_id.desc()).with_for_update().first()
+    last_txn_id = last.transaction_id if last else 0
+    tail = db.query(models.FundTransaction.amount) \
+        .filter(models.FundTransaction.fund_id == fund_id, models.FundTransaction.id > last_txn_id) \
+        .with_for_update().all()
+
+    if len(tail) >= SNAPSHOT_INTERVAL:
+        db.add(models.FundBalanceSnapshot(
+            fund_id=fund_id,
+            transaction_id=txn.id,
+            balance=(last.balance if last else 0) + sum(amount for amount, in tail)
+        ))
+    return txn
+
+def fund_exists(db: Session, fund_id: int) -> bool:
+    """True for live funds and for deleted funds that still have ledger history."""
+    if db.query(models.Fund.id).filter(models.Fund.id == fund_id).first():
+        return True
+    return db.query(models.FundTransaction.id).filter(models.FundTransaction.fund_id == fund_id).first() is not None
+
+def balance_as_of(db: Session, fund_id: int, as_of: datetime) -> float:
+    """Remaining balance of a fund at `as_of`: latest snapshot before it plus the ledger tail.
+
+    Naive `as_of` values are taken to be UTC, like the ledger timestamps.
+    """
+    as_of = to_utc(as_of)
+    snapshot = db.query(models.FundBalanceSnapshot) \
+        .join(models.FundTransaction, models.FundBalanceSnapshot.transaction_id == models.FundTransaction.id) \
+        .filter(models.FundBalanceSnapshot.fund_id == fund_id, models.FundTransaction.created_at <= as_of) \
+        .order_by(models.FundBalanceSnapshot.transaction_id.desc()).first()
+
+    base = snapshot.balance if snapshot else 0
+    last_txn_id = snapshot.transaction_id if snapshot else 0
+    tail = db.query(func.coalesce(func.sum(models.FundTransaction.amount), 0)) \
+        .filter(
+            models.FundTransaction.fund_id == fund_id,
+            models.FundTransaction.id > last_txn_id,
+            models.FundTransaction.created_at <= as_of
+        ).scalar()
+    return base + tail
+
+def to_utc(value: datetime) -> datetime:
+    """Convert a datetime to the naive UTC form ledger timestamps are stored in."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def reconcile_funds(db: Session, full: bool = False):
+    """Compare every fund's remaining_amount with its ledger balance in a single query.
+
+    Each fund's balance is its latest snapshot plus the ledger rows after it, read by
+    an index range seek, so at most SNAPSHOT_INTERVAL ledger rows are visited per
+    fund. `full=True` ignores the snapshots and re-sums the whole ledger, which also
+    catches a bad snapshot.
+    """
+    if full:
+        rows = _full_ledger_balances(db).all()
+    else:
+        rows = _snapshot_ledger_balances(db).all()
+
+    mismatches = []
+    for fund, ledger_balance in rows:
+        difference = fund.remaining_amount - ledger_balance
+        if abs(difference) > RECONCILE_TOLERANCE:
+            mismatches.append({
+                "fund_id": fund.id,
+                "fund_name": fund.fund_name,
+                "remaining_amount": fund.remaining_amount,
+                "ledger_balance": ledger_balance,
+                "difference": difference
+            })
+    return {"checked": len(rows), "mismatches": mismatches}
+
+def backfill_opening_entries(db: Session):
+    """Give funds created before the ledger existed an opening entry for their current balance."""
+    funds = db.query(models.Fund) \
+        .outerjoin(models.FundTransaction, models.FundTransaction.fund_id == models.Fund.id) \
+        .filter(models.FundTransaction.id.is_(None)).all()
+    for fund in funds:
+        db.add(models.FundTransaction(fund_id=fund.id, kind="opening", amount=fund.remaining_amount, user_id=fund.created_by))
+    if funds:
+        db.commit()
+
+def _snapshot_ledger_balances(db: Session):
+    latest = db.query(
+        models.FundBalanceSnapshot.fund_id.label("fund_id"),
+        func.max(models.FundBalanceSnapshot.transaction_id).label("transaction_id")
+    ).group_by(models.FundBalanceSnapshot.fund_id).subquery()
+
+    snapshots = db.query(
+        models.FundBalanceSnapshot.fund_id.label("fund_id"),
+        models.FundBalanceSnapshot.transaction_id.label("transaction_id"),
+        models.FundBalanceSnapshot.balance.label("balance")
+    ).join(latest, and_(
+        models.FundBalanceSnapshot.fund_id == latest.c.fund_id,
+        models.FundBalanceSnapshot.transaction_id == latest.c.transaction_id
+    )).subquery()
+
+    # Drive from funds and put the snapshot bound in the join condition, so each
+    # fund's tail is an index range seek on (fund_id, id) rather than a ledger scan
+    return db.query(models.Fund, func.coalesce(snapshots.c.balance, 0) + func.coalesce(func.sum(models.FundTransaction.amount), 0)) \
+        .outerjoin(snapshots, snapshots.c.fund_id == models.Fund.id) \
+        .outerjoin(models.FundTransaction, and_(
+            models.FundTransaction.fund_id == models.Fund.id,
+            models.FundTransaction.id > func.coalesce(snapshots.c.transaction_id, 0)
+        )) \
+        .group_by(models.Fund.id, snapshots.c.balance)
+
+def _full_ledger_balances(db: Session):
+    totals = db.query(
+        models.FundTransaction.fund_id.label("fund_id"),
+        func.sum(models.FundTransaction.amount).label("balance")
+    ).group_by(models.FundTransaction.fund_id).subquery()
+
+    return db.query(models.Fund, func.coalesce(totals.c.balance, 0)) \
+        .outerjoin(totals, totals.c.fund_id == models.Fund.id)
@@ -1,7 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from backend import models, auth
+from backend import models, auth, ledger
 from backend.database import engine, SessionLocal
 from backend.routers import auth as auth_router, users, funds, expenses, stats
 import os
@@ -32,6 +32,9 @@ async def lifespan(app: FastAPI):
             db.add(db_emp)
             
             db.commit()
+
+        # Funds created before the ledger existed start it from their current balance
+        ledger.backfill_opening_entries(db)
     finally:
         db.close()
     yield
@@ -1,7 +1,12 @@
 from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
 from sqlalchemy.sql import func
+from datetime import datetime, timezone
 from backend.database import Base
 
+def utcnow():
+    # Naive UTC, so ledger timestamps don't depend on the database server's time zone
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 class User(Base):
     __tablename__ = "users"
 
@@ -36,6 +41,28 @@ class Expense(Base):
     approved_by = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+class FundTransaction(Base):
+    __tablename__ = "fund_transactions"
+
+    # Append-only ledger: rows are never updated or deleted. fund_id is kept without
+    # a foreign key so the history survives fund deletion.
+    id = Column(Integer, primary_key=True, index=True)
+    fund_id = Column(Integer, index=True, nullable=False)
+    kind = Column(String(50), nullable=False) # 'opening', 'topup', 'approval', 'reversal', 'closure'
+    amount = Column(Float, nullable=False) # signed change to remaining_amount
+    expense_id = Column(Integer)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
+    created_at = Column(DateTime(timezone=True), default=utcnow, index=True)
+
+class FundBalanceSnapshot(Base):
+    __tablename__ = "fund_balance_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fund_id = Column(Integer, index=True, nullable=False)
+    transaction_id = Column(Integer, ForeignKey("fund_transactions.id"), nullable=False) # last ledger row covered
+    balance = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), default=utcnow)
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
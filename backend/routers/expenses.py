@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from backend import database, models, schemas, auth
+from backend import database, models, schemas, auth, ledger
 import os
 import shutil
 from datetime import datetime
@@ -117,6 +117,12 @@ def delete_expense(expense_id: int, db: Session = Depends(database.get_db), curr
     if expense.status != "pending" and current_user.role != "admin":
         raise HTTPException(status_code=400, detail="Only pending expenses can be deleted")
 
+    # Deleting an approved expense returns its amount to the fund
+    if expense.status == "approved":
+        fund = db.query(models.Fund).filter(models.Fund.id == expense.fund_id).with_for_update().first()
+        fund.remaining_amount += expense.amount
+        ledger.record_transaction(db, fund.id, "reversal", expense.amount, user_id=current_user.id, expense_id=expense.id)
+
     db.delete(expense)
     db.commit()
     
@@ -141,11 +147,12 @@ def update_expense_status(
         raise HTTPException(status_code=400, detail="Already processed")
 
     if request.status == "approved":
-        fund = db.query(models.Fund).filter(models.Fund.id == expense.fund_id).first()
+        fund = db.query(models.Fund).filter(models.Fund.id == expense.fund_id).with_for_update().first()
         if fund.remaining_amount < expense.amount:
             raise HTTPException(status_code=400, detail="Insufficient fund balance")
         
         fund.remaining_amount -= expense.amount
+        ledger.record_transaction(db, fund.id, "approval", -expense.amount, user_id=current_user.id, expense_id=expense.id)
         expense.status = "approved"
         expense.approved_by = current_user.id
         
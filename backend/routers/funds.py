@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
-from backend import database, models, schemas, auth
+from typing import List, Optional
+from datetime import datetime
+from backend import database, models, schemas, auth, ledger
 
 router = APIRouter(prefix="/funds", tags=["funds"])
 
@@ -9,6 +10,25 @@ router = APIRouter(prefix="/funds", tags=["funds"])
 def get_funds(db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.get_current_user)):
     return db.query(models.Fund).all()
 
+@router.get("/reconcile", response_model=schemas.ReconciliationReport)
+def reconcile_funds(full: bool = False, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.check_role(["admin", "accountant"]))):
+    return ledger.reconcile_funds(db, full=full)
+
+@router.get("/{fund_id}/transactions", response_model=List[schemas.FundTransaction])
+def get_fund_transactions(fund_id: int, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.check_role(["admin", "accountant"]))):
+    if not ledger.fund_exists(db, fund_id):
+        raise HTTPException(status_code=404, detail="Fund not found")
+    return db.query(models.FundTransaction) \
+        .filter(models.FundTransaction.fund_id == fund_id) \
+        .order_by(models.FundTransaction.id.desc()).all()
+
+@router.get("/{fund_id}/balance", response_model=schemas.FundBalance)
+def get_fund_balance(fund_id: int, as_of: Optional[datetime] = None, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.check_role(["admin", "accountant"]))):
+    if not ledger.fund_exists(db, fund_id):
+        raise HTTPException(status_code=404, detail="Fund not found")
+    as_of = ledger.to_utc(as_of) if as_of else models.utcnow()
+    return {"fund_id": fund_id, "as_of": as_of, "balance": ledger.balance_as_of(db, fund_id, as_of)}
+
 @router.post("", response_model=schemas.Fund)
 def create_fund(fund: schemas.FundCreate, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.check_role(["admin"]))):
     new_fund = models.Fund(
@@ -18,6 +38,8 @@ def create_fund(fund: schemas.FundCreate, db: Session = Depends(database.get_db)
         created_by=current_user.id
     )
     db.add(new_fund)
+    db.flush()
+    ledger.record_transaction(db, new_fund.id, "opening", new_fund.total_amount, user_id=current_user.id)
     db.commit()
     db.refresh(new_fund)
     
@@ -30,12 +52,13 @@ def create_fund(fund: schemas.FundCreate, db: Session = Depends(database.get_db)
 
 @router.patch("/{fund_id}/topup")
 def topup_fund(fund_id: int, request: schemas.TopupRequest, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.check_role(["admin"]))):
-    fund = db.query(models.Fund).filter(models.Fund.id == fund_id).first()
+    fund = db.query(models.Fund).filter(models.Fund.id == fund_id).with_for_update().first()
     if not fund:
         raise HTTPException(status_code=404, detail="Fund not found")
     
     fund.total_amount += request.amount
     fund.remaining_amount += request.amount
+    ledger.record_transaction(db, fund.id, "topup", request.amount, user_id=current_user.id)
     db.commit()
     
     # Log Action
@@ -47,13 +70,16 @@ def topup_fund(fund_id: int, request: schemas.TopupRequest, db: Session = Depend
 
 @router.delete("/{fund_id}")
 def delete_fund(fund_id: int, db: Session = Depends(database.get_db), current_user: models.User = Depends(auth.check_role(["admin"]))):
-    fund = db.query(models.Fund).filter(models.Fund.id == fund_id).first()
+    fund = db.query(models.Fund).filter(models.Fund.id == fund_id).with_for_update().first()
     if not fund:
         raise HTTPException(status_code=404, detail="Fund not found")
     
     # Optional: Check if there are associated expenses (though existing server.js just deletes)
     # db.query(models.Expense).filter(models.Expense.fund_id == fund_id).delete()
     
+    # The ledger outlives the fund; close it out so historical balances end at zero
+    if fund.remaining_amount:
+        ledger.record_transaction(db, fund.id, "closure", -fund.remaining_amount, user_id=current_user.id)
     db.delete(fund)
     db.commit()
     
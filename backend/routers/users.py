@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from backend import database, models, schemas, auth
+from backend import database, models, schemas, auth, ledger
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -41,7 +41,13 @@ def delete_user(user_id: int, db: Session = Depends(database.get_db), current_us
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-        
+
+    # The user's funds are cascade-deleted with them; close out their ledgers first
+    funds = db.query(models.Fund).filter(models.Fund.created_by == user_id).with_for_update().all()
+    for fund in funds:
+        if fund.remaining_amount:
+            ledger.record_transaction(db, fund.id, "closure", -fund.remaining_amount, user_id=current_user.id)
+
     db.delete(user)
     db.commit()
     
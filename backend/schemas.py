@@ -48,6 +48,33 @@ class Fund(FundBase):
 class TopupRequest(BaseModel):
     amount: float
 
+class FundTransaction(BaseModel):
+    id: int
+    fund_id: int
+    kind: str
+    amount: float
+    expense_id: Optional[int] = None
+    user_id: Optional[int] = None
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
+
+class FundBalance(BaseModel):
+    fund_id: int
+    as_of: datetime
+    balance: float
+
+class FundReconciliation(BaseModel):
+    fund_id: int
+    fund_name: str
+    remaining_amount: float
+    ledger_balance: float
+    difference: float
+
+class ReconciliationReport(BaseModel):
+    checked: int
+    mismatches: List[FundReconciliation]
+
 # Expense Schemas
 class ExpenseBase(BaseModel):
     amount: float
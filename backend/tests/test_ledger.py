@@ -0,0 +1,184 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from backend import models, ledger, schemas
+from backend.routers import expenses, funds, users
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    models.Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def admin(db):
+    user = models.User(name="Admin", email="admin@example.com", password="x", role="admin")
+    db.add(user)
+    db.commit()
+    return user
+
+def make_fund(db, admin, amount=100.0):
+    return funds.create_fund(schemas.FundCreate(fund_name="Office", total_amount=amount), db=db, current_user=admin)
+
+def spend(db, fund, amount, count=1):
+    for _ in range(count):
+        fund.remaining_amount -= amount
+        ledger.record_transaction(db, fund.id, "approval", -amount)
+    db.commit()
+
+def test_snapshot_every_interval(db, admin):
+    fund = make_fund(db, admin)
+    spend(db, fund, 1.0, count=2 * ledger.SNAPSHOT_INTERVAL - 1)
+
+    snapshots = db.query(models.FundBalanceSnapshot).order_by(models.FundBalanceSnapshot.id).all()
+    assert [(s.transaction_id, s.balance) for s in snapshots] == [(50, 51.0), (100, 1.0)]
+
+def test_balance_as_of_uses_snapshot_and_tail(db, admin):
+    fund = make_fund(db, admin)
+    spend(db, fund, 1.0, count=ledger.SNAPSHOT_INTERVAL + 9)
+
+    start = datetime(2026, 1, 1, 8, 0)
+    for txn in db.query(models.FundTransaction).all():
+        txn.created_at = start + timedelta(minutes=txn.id)
+    db.commit()
+
+    assert ledger.balance_as_of(db, fund.id, start) == 0
+    assert ledger.balance_as_of(db, fund.id, start + timedelta(minutes=1)) == 100.0
+    assert ledger.balance_as_of(db, fund.id, start + timedelta(minutes=55)) == 46.0
+    assert ledger.balance_as_of(db, fund.id, start + timedelta(days=1)) == fund.remaining_amount
+
+    # Aware values are converted to UTC rather than having their offset dropped
+    dubai = timezone(timedelta(hours=4))
+    assert ledger.balance_as_of(db, fund.id, datetime(2026, 1, 1, 12, 55, tzinfo=dubai)) == 46.0
+
+def test_reconcile_reports_mismatches(db, admin):
+    fund = make_fund(db, admin)
+    spend(db, fund, 0.1, count=ledger.SNAPSHOT_INTERVAL + 20)
+    assert ledger.reconcile_funds(db) == {"checked": 1, "mismatches": []}
+    assert ledger.reconcile_funds(db, full=True) == {"checked": 1, "mismatches": []}
+
+    fund.remaining_amount += 5
+    db.commit()
+    report = ledger.reconcile_funds(db)
+    assert report["checked"] == 1
+    assert [m["fund_id"] for m in report["mismatches"]] == [fund.id]
+    assert report["mismatches"][0]["difference"] == pytest.approx(5)
+
+def test_reconcile_seeks_ledger_tail_only(db):
+    query = ledger._snapshot_ledger_balances(db)
+    sql = str(query.statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+    plan = [row[3] for row in db.execute(text("EXPLAIN QUERY PLAN " + sql))]
+
+    ledger_steps = [step for step in plan if "fund_transactions" in step]
+    assert ledger_steps and all(step.startswith("SEARCH") and "rowid>?" in step for step in ledger_steps)
+
+def test_full_reconcile_catches_bad_snapshot(db, admin):
+    fund = make_fund(db, admin)
+    spend(db, fund, 1.0, count=ledger.SNAPSHOT_INTERVAL)
+
+    db.query(models.FundBalanceSnapshot).one().balance += 1
+    db.commit()
+    assert len(ledger.reconcile_funds(db)["mismatches"]) == 1
+    assert ledger.reconcile_funds(db, full=True)["mismatches"] == []
+
+def ledger_rows(db, fund_id):
+    rows = db.query(models.FundTransaction).filter(models.FundTransaction.fund_id == fund_id).order_by(models.FundTransaction.id).all()
+    return [(row.kind, row.amount) for row in rows]
+
+def submit_expense(db, admin, fund, amount):
+    expense = models.Expense(user_id=admin.id, fund_id=fund.id, amount=amount, category="Travel")
+    db.add(expense)
+    db.commit()
+    return expense
+
+def test_topup_records_ledger_entry(db, admin):
+    fund = make_fund(db, admin)
+
+    funds.topup_fund(fund.id, schemas.TopupRequest(amount=25.0), db=db, current_user=admin)
+
+    assert fund.remaining_amount == 125.0
+    assert ledger_rows(db, fund.id) == [("opening", 100.0), ("topup", 25.0)]
+    assert ledger.reconcile_funds(db)["mismatches"] == []
+
+def test_approval_records_ledger_entry(db, admin):
+    fund = make_fund(db, admin)
+    expense = submit_expense(db, admin, fund, 30.0)
+
+    expenses.update_expense_status(expense.id, schemas.StatusUpdateRequest(status="approved"), db=db, current_user=admin)
+
+    assert fund.remaining_amount == 70.0
+    assert ledger_rows(db, fund.id) == [("opening", 100.0), ("approval", -30.0)]
+    approval = db.query(models.FundTransaction).filter(models.FundTransaction.kind == "approval").one()
+    assert approval.expense_id == expense.id
+    assert ledger.reconcile_funds(db)["mismatches"] == []
+
+def test_rejection_leaves_ledger_untouched(db, admin):
+    fund = make_fund(db, admin)
+    expense = submit_expense(db, admin, fund, 30.0)
+
+    expenses.update_expense_status(expense.id, schemas.StatusUpdateRequest(status="rejected"), db=db, current_user=admin)
+
+    assert ledger_rows(db, fund.id) == [("opening", 100.0)]
+
+def test_delete_approved_expense_records_reversal(db, admin):
+    fund = make_fund(db, admin)
+    expense = submit_expense(db, admin, fund, 30.0)
+    expenses.update_expense_status(expense.id, schemas.StatusUpdateRequest(status="approved"), db=db, current_user=admin)
+
+    expenses.delete_expense(expense.id, db=db, current_user=admin)
+
+    assert fund.remaining_amount == 100.0
+    reversal = db.query(models.FundTransaction).filter(models.FundTransaction.kind == "reversal").one()
+    assert (reversal.amount, reversal.expense_id) == (30.0, expense.id)
+    assert ledger.reconcile_funds(db)["mismatches"] == []
+
+def test_delete_fund_records_closure(db, admin):
+    fund = make_fund(db, admin)
+    funds.topup_fund(fund.id, schemas.TopupRequest(amount=20.0), db=db, current_user=admin)
+
+    funds.delete_fund(fund.id, db=db, current_user=admin)
+
+    assert ledger_rows(db, fund.id) == [("opening", 100.0), ("topup", 20.0), ("closure", -120.0)]
+
+def test_backfill_opening_entries_is_idempotent(db, admin):
+    db.add(models.Fund(fund_name="Legacy", total_amount=80.0, remaining_amount=60.0, created_by=admin.id))
+    db.commit()
+
+    ledger.backfill_opening_entries(db)
+    ledger.backfill_opening_entries(db)
+
+    entries = db.query(models.FundTransaction).all()
+    assert [(e.kind, e.amount) for e in entries] == [("opening", 60.0)]
+
+def test_delete_user_closes_fund_ledgers(db, admin):
+    owner = models.User(name="Owner", email="owner@example.com", password="x", role="admin")
+    db.add(owner)
+    db.commit()
+    fund = make_fund(db, owner, amount=40.0)
+
+    users.delete_user(owner.id, db=db, current_user=admin)
+
+    assert ledger.balance_as_of(db, fund.id, models.utcnow()) == 0
+
+def test_deleted_fund_keeps_history(db, admin):
+    fund = make_fund(db, admin)
+    funds.delete_fund(fund.id, db=db, current_user=admin)
+
+    assert funds.get_fund_balance(fund.id, db=db, current_user=admin)["balance"] == 0
+    history = funds.get_fund_transactions(fund.id, db=db, current_user=admin)
+    assert [(row.kind, row.amount) for row in history] == [("closure", -100.0), ("opening", 100.0)]
+
+def test_unknown_fund_is_404(db, admin):
+    make_fund(db, admin)
+
+    for endpoint in (funds.get_fund_balance, funds.get_fund_transactions):
+        with pytest.raises(HTTPException) as exc:
+            endpoint(999, db=db, current_user=admin)
+        assert exc.value.status_code == 404